@@ -1,26 +1,225 @@
-from typing import cast, Union, Optional, Iterable, Mapping, Sequence, Any
+from typing import (
+    Union,
+    Optional,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Deque,
+    Literal,
+    Callable,
+    TypeVar,
+)
 from pathlib import Path
 import shutil
+import tempfile
+import glob
+import errno
 import os
 import os.path
+import io
+import mmap
+import pickle
+import importlib.util
+import codecs
+import locale
+import threading
+import atexit
 import logging
+import math
+import re
 import json
 import csv
-from collections import abc
-from itertools import chain
-
-from tqdm import tqdm as _tqdm
-import toml
-import joblib
+from collections import abc, deque
+from itertools import chain, islice
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 PathType = Union[str, os.PathLike]
 
+_T = TypeVar('_T')
+
+
+# NOTE: tqdm, toml(lib) and joblib are imported lazily to reduce the import time.
+def _tqdm(iterable: Iterable[Any], **kwargs: Any):
+    from tqdm import tqdm
+    return tqdm(iterable, **kwargs)
+
+
+# Larger than the io.DEFAULT_BUFFER_SIZE (8KiB) to reduce the read/write syscalls.
+DEFAULT_BUFFERING = 1 << 20
+
+
+# sequential: Double the kernel readahead window.
+# dontneed: Also drop the file from the page cache on close, for one-shot reads.
+# default: No hint.
+CacheHint = Literal['sequential', 'dontneed', 'default']
+
+
+def _posix_fadvise(fd: int, advice_name: str):
+    # Linux only.
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice_name))
+        except OSError:
+            pass
+
+
+def _apply_cache_hint_on_open(fd: int, cache_hint: CacheHint):
+    if cache_hint in ('sequential', 'dontneed'):
+        _posix_fadvise(fd, 'POSIX_FADV_SEQUENTIAL')
+
+
+def _apply_cache_hint_on_close(fd: int, cache_hint: CacheHint):
+    if cache_hint == 'dontneed':
+        _posix_fadvise(fd, 'POSIX_FADV_DONTNEED')
+
+
+@contextmanager
+def _cache_hint(fd: int, cache_hint: CacheHint):
+    _apply_cache_hint_on_open(fd, cache_hint)
+    try:
+        yield
+    finally:
+        _apply_cache_hint_on_close(fd, cache_hint)
+
+
+# orjson parses the integers beyond 64-bit to floats, leave them to json.
+# Searching the runs of 19+ digits is much faster than searching the lossy cases directly.
+_JSON_LONG_DIGITS_PATTERN = re.compile(r'[0-9]{19,}')
+_JSON_LONG_DIGITS_BYTES_PATTERN = re.compile(rb'[0-9]{19,}')
+
+
+def _has_lossy_integer(text: Any, pattern: 're.Pattern[Any]', minus: Any):
+    # i64 min and u64 max have 19 and 20 digits, only the positive 19 digits are exact.
+    match = pattern.search(text)
+    while match is not None:
+        start, end = match.span()
+        if end - start > 19 or text[start - 1:start] == minus:
+            return True
+        match = pattern.search(text, end)
+    return False
+
+
+def _orjson_loads(text: str):
+    # Make linter happy.
+    assert orjson is not None
+
+    if not _has_lossy_integer(text, _JSON_LONG_DIGITS_PATTERN, '-'):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # Fallback to json for the cases rejected by orjson (e.g. NaN, Infinity).
+            pass
+    return json.loads(text)
+
+
+_json_loads = _orjson_loads if orjson is not None else json.loads
+
+
+def _is_json_native(struct: Any) -> bool:
+    # Whether struct only holds the exact json types and finite floats.
+    # Otherwise orjson differs from json, e.g., writes NaN as null and encodes Enum or UUID,
+    # which json rejects.
+    struct_type = type(struct)
+    if struct_type is str or struct_type is int or struct_type is bool or struct is None:
+        return True
+    if struct_type is float:
+        return math.isfinite(struct)
+    if struct_type is dict:
+        return all(map(_is_json_native, struct)) and all(map(_is_json_native, struct.values()))
+    if struct_type is list or struct_type is tuple:
+        return all(map(_is_json_native, struct))
+    return False
+
+
+def _orjson_dumps(struct: Any, ensure_ascii: bool, indent: Optional[int]):
+    # orjson always emits UTF-8 and only supports 2-space indentation.
+    if orjson is None or ensure_ascii or indent not in (None, 2):
+        return None
+
+    if not _is_json_native(struct):
+        # Leave to json, to raise or encode as json does.
+        return None
+
+    # Raise instead of encoding datetime and dataclass natively.
+    option = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+    if indent == 2:
+        option |= orjson.OPT_INDENT_2
+    try:
+        data: bytes = orjson.dumps(struct, option=option)
+        return data
+    except orjson.JSONEncodeError:
+        # Fallback to json for the cases not supported by orjson (e.g. int > 64-bit).
+        return None
+
+
+def _stdlib_json_dumps(struct: Any, ensure_ascii: bool, indent: Optional[int]):
+    # Compact as orjson, so that the output does not depend on the path taken.
+    separators = (',', ':') if indent is None else None
+    return json.dumps(struct, ensure_ascii=ensure_ascii, indent=indent, separators=separators)
+
+
+def _json_dumps(struct: Any, ensure_ascii: bool, indent: Optional[int] = None):
+    data = _orjson_dumps(struct, ensure_ascii=ensure_ascii, indent=indent)
+    if data is not None:
+        return data.decode('utf-8')
+    return _stdlib_json_dumps(struct, ensure_ascii=ensure_ascii, indent=indent)
+
+
+def _json_dumps_utf8(struct: Any, ensure_ascii: bool, indent: Optional[int] = None):
+    data = _orjson_dumps(struct, ensure_ascii=ensure_ascii, indent=indent)
+    if data is not None:
+        return data
+    return _stdlib_json_dumps(struct, ensure_ascii=ensure_ascii, indent=indent).encode('utf-8')
+
+
+def _is_utf8_encoding(encoding: Optional[str]):
+    return codecs.lookup(encoding or locale.getpreferredencoding(False)).name == 'utf-8'
+
+
+def _is_utf8_output(encoding: Optional[str], errors: Optional[str], newline: Optional[str]):
+    # Whether writing UTF-8 bytes is equivalent to the text mode.
+    return (
+        _is_utf8_encoding(encoding) and errors is None
+        and (newline in ('', '\n') or (newline is None and os.linesep == '\n'))
+    )
+
 
 def folder(
     raw_path: PathType,
     expandvars: bool = False,
     exists: bool = False,
     reset: bool = False,
+    reset_in_background: bool = False,
     touch: bool = False,
 ):
     if expandvars:
@@ -36,15 +235,57 @@ def folder(
 
     if reset:
         if path.exists():
+            trash = None
+            if reset_in_background and path.is_dir():
+                # Move the sub-folders to the trash and remove it in a thread.
+                # Resolve first, e.g., the parent of '.' is the folder itself.
+                resolved_path = path.resolve()
+                if resolved_path.parent != resolved_path:
+                    try:
+                        trash = Path(
+                            tempfile.mkdtemp(
+                                prefix=f'.{resolved_path.name}.',
+                                dir=resolved_path.parent,
+                            )
+                        )
+                    except OSError:
+                        logging.warning(f'Cannot create trash folder for {path}.')
+
             # Remove children instead.
-            for child in path.iterdir():
-                if child.is_dir():
+            # DirEntry.is_dir uses the cached file type, saving a stat per child.
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=False):
+                        try:
+                            os.unlink(entry.path)
+                        except FileNotFoundError:
+                            # Removed concurrently.
+                            pass
+                        continue
+
+                    if trash is not None:
+                        try:
+                            os.rename(entry.path, trash / entry.name)
+                            continue
+                        except OSError:
+                            # Fallback to rmtree, e.g. crossing the filesystem.
+                            pass
+
                     try:
-                        shutil.rmtree(child)
+                        shutil.rmtree(entry.path)
+                    except FileNotFoundError:
+                        # Removed concurrently.
+                        pass
                     except OSError:
-                        logging.warning(f'Cannot remove folder {child}.')
-                else:
-                    child.unlink()
+                        logging.warning(f'Cannot remove folder {entry.path}.')
+
+            if trash is not None:
+                threading.Thread(
+                    target=shutil.rmtree,
+                    args=(trash,),
+                    kwargs={'ignore_errors': True},
+                ).start()
+
         else:
             os.makedirs(path, exist_ok=True)
 
@@ -73,41 +314,426 @@ def file(
     return path
 
 
+# Minimum buffering to activate the io_uring path of read_text_lines.
+_URING_MIN_BUFFERING = 4 << 20
+
+
+class _UringPool:
+
+    def __init__(self, chunk_size: int, depth: int):
+        # Make linter happy.
+        assert liburing is not None
+
+        self.chunk_size = chunk_size
+        self.depth = depth
+        self.in_use = False
+
+        self.ring = liburing.Ring()
+        self.cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(depth, self.ring)
+        try:
+            # Pin the buffers once, instead of per read.
+            self.buffers = [bytearray(chunk_size) for _ in range(depth)]
+            # NOTE: The stubs of liburing miss the arguments of Iovec and FileIndex.
+            self.iovecs = liburing.Iovec(self.buffers)  # type: ignore
+            liburing.io_uring_register_buffers(self.ring, self.iovecs)
+        except OSError:
+            liburing.io_uring_queue_exit(self.ring)
+            raise
+
+    def register_file(self, fd: int):
+        # Make linter happy.
+        assert liburing is not None
+        liburing.io_uring_register_files(self.ring, liburing.FileIndex([fd]))  # type: ignore
+
+    def unregister_file(self):
+        # Make linter happy.
+        assert liburing is not None
+        liburing.io_uring_unregister_files(self.ring)
+
+    def prep_read(self, buf_idx: int, offset: int, user_data: int):
+        # Make linter happy.
+        assert liburing is not None
+
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        if sqe is None:
+            # The submission queue is full, submit the pending entries and retry.
+            liburing.io_uring_submit(self.ring)
+            sqe = liburing.io_uring_get_sqe(self.ring)
+            if sqe is None:
+                raise OSError(errno.EBUSY, 'io_uring submission queue is full.')
+
+        # The file is registered as index 0.
+        liburing.io_uring_prep_read_fixed(sqe, 0, self.buffers[buf_idx], buf_idx, offset)
+        liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_FIXED_FILE)
+        liburing.io_uring_sqe_set_data64(sqe, user_data)
+
+    def submit(self):
+        # Make linter happy.
+        assert liburing is not None
+        liburing.io_uring_submit(self.ring)
+
+    def wait(self):
+        # Make linter happy.
+        assert liburing is not None
+
+        liburing.io_uring_wait_cqe(self.ring, self.cqe)
+        entry = self.cqe[0]
+        assert entry is not None and entry.res is not None
+        user_data, res = entry.user_data, entry.res
+        liburing.io_uring_cqe_seen(self.ring, entry)
+        return user_data, res
+
+    def close(self):
+        # Make linter happy.
+        assert liburing is not None
+        liburing.io_uring_unregister_buffers(self.ring)
+        liburing.io_uring_queue_exit(self.ring)
+
+
+# Shared across calls, protected by _uring_pool_lock.
+_uring_pool: Optional[_UringPool] = None
+_uring_pool_lock = threading.Lock()
+
+# Maximum buffer bytes of the shared pool, the larger pools are closed on release.
+_URING_POOL_MAX_SHARED_SIZE = 64 << 20
+
+
+def _acquire_uring_pool(chunk_size: int, depth: int):
+    global _uring_pool
+
+    if chunk_size * depth > _URING_POOL_MAX_SHARED_SIZE:
+        # Private pool, not to keep the buffers until exit.
+        return _UringPool(chunk_size, depth)
+
+    with _uring_pool_lock:
+        if _uring_pool is not None and _uring_pool.in_use:
+            # Interleaved readers, use a private pool.
+            return _UringPool(chunk_size, depth)
+
+        if _uring_pool is not None and (
+            _uring_pool.chunk_size != chunk_size or _uring_pool.depth != depth
+        ):
+            _uring_pool.close()
+            _uring_pool = None
+
+        if _uring_pool is None:
+            _uring_pool = _UringPool(chunk_size, depth)
+
+        _uring_pool.in_use = True
+        return _uring_pool
+
+
+def _release_uring_pool(pool: _UringPool):
+    with _uring_pool_lock:
+        if pool is _uring_pool:
+            pool.in_use = False
+        else:
+            pool.close()
+
+
+@atexit.register
+def _close_uring_pool():
+    global _uring_pool
+
+    with _uring_pool_lock:
+        if _uring_pool is not None and not _uring_pool.in_use:
+            _uring_pool.close()
+            _uring_pool = None
+
+
+def _uring_read_chunks(
+    path: Path,
+    chunk_size: int,
+    cache_hint: CacheHint,
+    depth: int = 8,
+):
+    fd = os.open(path, os.O_RDONLY)
+    _apply_cache_hint_on_open(fd, cache_hint)
+    pool = None
+    file_registered = False
+    num_inflight = 0
+
+    try:
+        pool = _acquire_uring_pool(chunk_size, depth)
+        pool.register_file(fd)
+        file_registered = True
+
+        file_size = os.fstat(fd).st_size
+        num_chunks = (file_size + chunk_size - 1) // chunk_size
+        num_buffers = min(depth, num_chunks)
+
+        # Keep up to depth reads in flight, chunk idx is read into buffers[idx % num_buffers].
+        for idx in range(num_buffers):
+            pool.prep_read(idx, idx * chunk_size, idx)
+        pool.submit()
+        num_inflight = num_buffers
+
+        # Completions are out of order, map chunk idx -> result.
+        results: Dict[int, int] = {}
+        for idx in range(num_chunks):
+            buf_idx = idx % num_buffers
+            offset = idx * chunk_size
+            end = min(offset + chunk_size, file_size)
+
+            while offset < end:
+                while idx not in results:
+                    user_data, res = pool.wait()
+                    results[user_data] = res
+                    num_inflight -= 1
+
+                res = results.pop(idx)
+                if res < 0:
+                    raise OSError(-res, os.strerror(-res), str(path))
+                if res == 0:
+                    # EOF, the file is truncated while reading.
+                    return
+
+                num_bytes = min(res, end - offset)
+                yield bytes(memoryview(pool.buffers[buf_idx])[:num_bytes])
+                offset += num_bytes
+
+                if offset < end:
+                    # Short read, resubmit the remaining bytes of this chunk.
+                    pool.prep_read(buf_idx, offset, idx)
+                    pool.submit()
+                    num_inflight += 1
+
+            next_idx = idx + num_buffers
+            if next_idx < num_chunks:
+                pool.prep_read(buf_idx, next_idx * chunk_size, next_idx)
+                pool.submit()
+                num_inflight += 1
+
+    finally:
+        if pool is not None:
+            # Drain the in-flight reads before reusing the buffers.
+            while num_inflight > 0:
+                pool.wait()
+                num_inflight -= 1
+            if file_registered:
+                pool.unregister_file()
+            _release_uring_pool(pool)
+        _apply_cache_hint_on_close(fd, cache_hint)
+        os.close(fd)
+
+
+def _decode_lines(
+    chunks: Iterable[bytes],
+    encoding: Optional[str],
+    errors: Optional[str],
+    newline: Optional[str],
+):
+    # Mimic the text mode with newline=None or newline='\n'.
+    assert newline in (None, '\n')
+    decoder = codecs.getincrementaldecoder(encoding or locale.getpreferredencoding(False))(
+        errors or 'strict'
+    )
+    if newline is None:
+        decoder = io.IncrementalNewlineDecoder(decoder, translate=True)
+
+    tail = ''
+    for chunk in chain(chunks, (None,)):
+        if chunk is None:
+            text = decoder.decode(b'', final=True)
+        else:
+            text = decoder.decode(chunk)
+
+        # Split by '\n' only, keeping line ends.
+        lines = io.StringIO(tail + text, newline='\n').readlines()
+        tail = ''
+        if lines and not lines[-1].endswith('\n'):
+            tail = lines.pop()
+        yield from lines
+
+    if tail:
+        yield tail
+
+
+# Decode size of the text mode per read, 8KiB by default.
+_TEXT_CHUNK_SIZE = 1 << 17
+
+
+def _set_text_chunk_size(fin: Any):
+    # TextIOWrapper decodes the bytes and splits the lines in chunks of _CHUNK_SIZE.
+    if hasattr(fin, '_CHUNK_SIZE'):
+        fin._CHUNK_SIZE = _TEXT_CHUNK_SIZE
+
+
+def _use_zstd(path: Path, compression: Optional[str]):
+    if compression is None:
+        # Detect by suffix.
+        use_zstd = (path.suffix == '.zst')
+    elif compression == 'zstd':
+        use_zstd = True
+    else:
+        raise ValueError(f'compression={compression} not supported.')
+
+    if use_zstd and zstandard is None:
+        raise ImportError('zstandard is required for zstd compression.')
+    return use_zstd
+
+
+def _iter_text_lines(
+    path: Path,
+    buffering: int,
+    encoding: Optional[str],
+    errors: Optional[str],
+    newline: Optional[str],
+    cache_hint: CacheHint,
+    compression: Optional[str],
+):
+    if _use_zstd(path, compression):
+        # Make linter happy.
+        assert zstandard is not None
+
+        # closefd=False, raw should stay open until the cache hint applies on close.
+        with path.open(
+            mode='rb',
+            buffering=buffering,
+        ) as raw, _cache_hint(raw.fileno(), cache_hint), io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(
+                raw,
+                read_size=DEFAULT_BUFFERING,
+                closefd=False,
+            ),
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+        ) as fin:
+            _set_text_chunk_size(fin)
+            yield from fin
+        return
+
+    if (
+        liburing is not None and buffering >= _URING_MIN_BUFFERING
+        and newline in (None, '\n')
+    ):
+        chunks = _uring_read_chunks(path, chunk_size=buffering, cache_hint=cache_hint)
+        try:
+            # Probe the first chunk, fallback if io_uring is not usable.
+            first_chunk = next(chunks, b'')
+        except OSError:
+            pass
+        else:
+            yield from _decode_lines(
+                chain((first_chunk,), chunks),
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+            )
+            return
+
+    with path.open(
+        mode='r',
+        buffering=buffering,
+        encoding=encoding,
+        errors=errors,
+        newline=newline,
+    ) as fin, _cache_hint(fin.fileno(), cache_hint):
+        _set_text_chunk_size(fin)
+        yield from fin
+
+
 def read_text_lines(
     raw_path: PathType,
     expandvars: bool = False,
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
     newline: Optional[str] = None,
     strip: bool = False,
     skip_empty: bool = False,
     tqdm: bool = False,
+    cache_hint: CacheHint = 'sequential',
+    compression: Optional[str] = None,
 ):
     path = file(raw_path, expandvars=expandvars, exists=True)
 
-    with path.open(
-        mode='r',
+    texts = _iter_text_lines(
+        path,
         buffering=buffering,
         encoding=encoding,
         errors=errors,
         newline=newline,
-    ) as fin:
-        if tqdm:
-            fin = _tqdm(fin)
+        cache_hint=cache_hint,
+        compression=compression,
+    )
+    if tqdm:
+        texts = _tqdm(texts)
 
-        for text in fin:
-            text = cast(str, text)
-            if strip:
-                text = text.strip()
-            if not skip_empty or text:
-                yield text
+    for text in texts:
+        if strip:
+            text = text.strip()
+        if not skip_empty or text:
+            yield text
+
+
+def _append_newlines(texts: Iterable[str], strip: bool, skip_empty: bool):
+    for text in texts:
+        if strip:
+            text = text.strip()
+        if skip_empty and not text:
+            continue
+        yield text + '\n'
+
+
+@contextmanager
+def _open_binary_output(path: Path, buffering: int, compression: Optional[str]):
+    if _use_zstd(path, compression):
+        # Make linter happy.
+        assert zstandard is not None
+
+        # Multi-threaded compression.
+        compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+        with path.open(mode='wb', buffering=buffering) as raw, compressor.stream_writer(
+            raw,
+            write_size=DEFAULT_BUFFERING,
+        ) as fout:
+            yield fout
+
+    else:
+        with path.open(mode='wb', buffering=buffering) as fout:
+            yield fout
+
+
+@contextmanager
+def _open_text_output(
+    path: Path,
+    buffering: int,
+    encoding: Optional[str],
+    errors: Optional[str],
+    newline: Optional[str],
+    compression: Optional[str],
+):
+    if _use_zstd(path, compression):
+        with _open_binary_output(
+            path,
+            buffering=buffering,
+            compression=compression,
+        ) as raw, io.TextIOWrapper(
+            raw,
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+        ) as fout:
+            yield fout
+
+    else:
+        with path.open(
+            mode='w',
+            buffering=buffering,
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+        ) as fout:
+            yield fout
 
 
 def write_text_lines(
     raw_path: PathType,
     texts: Iterable[str],
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     expandvars: bool = False,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
@@ -115,32 +741,117 @@ def write_text_lines(
     strip: bool = False,
     skip_empty: bool = False,
     tqdm: bool = False,
+    compression: Optional[str] = None,
 ):
     path = file(raw_path, expandvars=expandvars)
 
-    with path.open(
-        mode='w',
+    with _open_text_output(
+        path,
         buffering=buffering,
         encoding=encoding,
         errors=errors,
         newline=newline,
+        compression=compression,
     ) as fout:
+        lines = _append_newlines(texts, strip=strip, skip_empty=skip_empty)
         if tqdm:
-            fout = _tqdm(fout)
+            lines = _tqdm(lines)
+
+        fout.writelines(lines)
 
-        for text in texts:
-            if strip:
-                text = text.strip()
-            if skip_empty and not text:
+
+def _decode_json_lines_strict(numbered_texts: Iterable[Tuple[int, str]], skip_empty: bool):
+    loads = _json_loads
+    for _, text in numbered_texts:
+        struct: Union[Mapping, Sequence] = loads(text)
+        if skip_empty and not struct:
+            continue
+        yield struct
+
+
+def _decode_json_lines_lenient(
+    numbered_texts: Iterable[Tuple[int, str]],
+    skip_empty: bool,
+    silent: bool,
+):
+    loads = _json_loads
+    for num, text in numbered_texts:
+        try:
+            struct: Union[Mapping, Sequence] = loads(text)
+            if skip_empty and not struct:
                 continue
-            fout.write(text)
-            fout.write('\n')
+            yield struct
+
+        except json.JSONDecodeError:
+            if not silent:
+                logging.warning(f'Cannot parse #{num}: "{text}"')
+
+
+def _decode_json_lines(
+    numbered_texts: Iterable[Tuple[int, str]],
+    skip_empty: bool,
+    ignore_error: bool,
+    silent: bool,
+):
+    # Dispatch once instead of handling the error per line.
+    if ignore_error:
+        return _decode_json_lines_lenient(numbered_texts, skip_empty=skip_empty, silent=silent)
+    else:
+        return _decode_json_lines_strict(numbered_texts, skip_empty=skip_empty)
+
+
+def _decode_json_lines_batch(
+    numbered_texts: Sequence[Tuple[int, str]],
+    skip_empty: bool,
+    ignore_error: bool,
+    silent: bool,
+):
+    return list(
+        _decode_json_lines(
+            numbered_texts,
+            skip_empty=skip_empty,
+            ignore_error=ignore_error,
+            silent=silent,
+        )
+    )
+
+
+# Number of lines per task of read_json_lines(workers > 1).
+_JSON_LINES_BATCH_SIZE = 1024
+
+
+def _decode_json_lines_concurrently(
+    numbered_texts: Iterable[Tuple[int, str]],
+    workers: int,
+    skip_empty: bool,
+    ignore_error: bool,
+    silent: bool,
+):
+    numbered_texts = iter(numbered_texts)
+    batches = iter(lambda: list(islice(numbered_texts, _JSON_LINES_BATCH_SIZE)), [])
+    decode_batch = partial(
+        _decode_json_lines_batch,
+        skip_empty=skip_empty,
+        ignore_error=ignore_error,
+        silent=silent,
+    )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Bound the in-flight batches, and yield in the submission order.
+        futures: Deque[Future] = deque()
+        for batch in batches:
+            futures.append(executor.submit(decode_batch, batch))
+            if len(futures) >= 2 * workers:
+                yield from futures.popleft().result()
+
+        while futures:
+            yield from futures.popleft().result()
 
 
 def read_json_lines(
     raw_path: PathType,
     expandvars: bool = False,
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
     newline: Optional[str] = None,
@@ -148,8 +859,11 @@ def read_json_lines(
     ignore_error: bool = False,
     silent: bool = False,
     tqdm: bool = False,
+    cache_hint: CacheHint = 'sequential',
+    compression: Optional[str] = None,
+    workers: int = 1,
 ):
-    for num, text in enumerate(
+    numbered_texts = enumerate(
         read_text_lines(
             raw_path,
             expandvars=expandvars,
@@ -159,34 +873,41 @@ def read_json_lines(
             newline=newline,
             strip=False,
             tqdm=tqdm,
+            cache_hint=cache_hint,
+            compression=compression,
         )
-    ):
-        try:
-            struct: Union[Mapping, Sequence] = json.loads(text)
-            if skip_empty and not struct:
-                continue
-            yield struct
+    )
 
-        except json.JSONDecodeError:
-            if not ignore_error:
-                raise
-            if not silent:
-                logging.warning(f'Cannot parse #{num}: "{text}"')
+    if workers > 1:
+        # Read the lines in this thread while the workers decode the previous batches.
+        yield from _decode_json_lines_concurrently(
+            numbered_texts,
+            workers=workers,
+            skip_empty=skip_empty,
+            ignore_error=ignore_error,
+            silent=silent,
+        )
+    else:
+        yield from _decode_json_lines(
+            numbered_texts,
+            skip_empty=skip_empty,
+            ignore_error=ignore_error,
+            silent=silent,
+        )
 
 
-def _encode_json_lines(
+def _encode_structs(
     structs: Iterable[Union[Mapping, Sequence]],
+    encode: Callable[[Union[Mapping, Sequence]], _T],
     skip_empty: bool,
-    ensure_ascii: bool,
     silent: bool,
     ignore_error: bool,
-):
+) -> Iterator[_T]:
     for num, struct in enumerate(structs):
         try:
             if skip_empty and not struct:
                 continue
-            text = json.dumps(struct, ensure_ascii=ensure_ascii)
-            yield text
+            yield encode(struct)
 
         except (TypeError, OverflowError, ValueError):
             if not ignore_error:
@@ -195,20 +916,82 @@ def _encode_json_lines(
                 logging.warning(f'Cannot encode #{num}: "{struct}"')
 
 
+def _encode_json_lines(
+    structs: Iterable[Union[Mapping, Sequence]],
+    skip_empty: bool,
+    ensure_ascii: bool,
+    silent: bool,
+    ignore_error: bool,
+):
+    return _encode_structs(
+        structs,
+        encode=lambda struct: _json_dumps(struct, ensure_ascii=ensure_ascii),
+        skip_empty=skip_empty,
+        silent=silent,
+        ignore_error=ignore_error,
+    )
+
+
+def _encode_json_utf8_lines(
+    structs: Iterable[Union[Mapping, Sequence]],
+    skip_empty: bool,
+    ensure_ascii: bool,
+    silent: bool,
+    ignore_error: bool,
+):
+    # With the line ends, to be written as is.
+    return _encode_structs(
+        structs,
+        encode=lambda struct: _json_dumps_utf8(struct, ensure_ascii=ensure_ascii) + b'\n',
+        skip_empty=skip_empty,
+        silent=silent,
+        ignore_error=ignore_error,
+    )
+
+
+# Number of lines joined per write by _write_bytes_lines.
+_BYTES_LINES_BATCH_SIZE = 256
+
+
+def _write_bytes_lines(fout: Any, lines: Iterable[bytes]):
+    # Join the lines to reduce the write calls, also the zstd writer has no writelines.
+    lines = iter(lines)
+    for batch in iter(lambda: list(islice(lines, _BYTES_LINES_BATCH_SIZE)), []):
+        fout.write(b''.join(batch))
+
+
 def write_json_lines(
     raw_path: PathType,
     structs: Iterable[Union[Mapping, Sequence]],
     expandvars: bool = False,
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
     newline: Optional[str] = None,
     skip_empty: bool = False,
-    ensure_ascii: bool = True,
+    ensure_ascii: bool = False,
     ignore_error: bool = False,
     silent: bool = False,
     tqdm: bool = False,
+    compression: Optional[str] = None,
 ):
+    if _is_utf8_output(encoding, errors, newline):
+        # Write the encoded bytes directly, skipping the re-encoding of the text mode.
+        path = file(raw_path, expandvars=expandvars)
+        with _open_binary_output(path, buffering=buffering, compression=compression) as fout:
+            lines = _encode_json_utf8_lines(
+                structs,
+                skip_empty=skip_empty,
+                ensure_ascii=ensure_ascii,
+                silent=silent,
+                ignore_error=ignore_error,
+            )
+            if tqdm:
+                lines = _tqdm(lines)
+
+            _write_bytes_lines(fout, lines)
+        return
+
     write_text_lines(
         raw_path,
         _encode_json_lines(
@@ -224,13 +1007,143 @@ def write_json_lines(
         errors=errors,
         newline=newline,
         tqdm=tqdm,
+        compression=compression,
+    )
+
+
+def _build_csv_row_factory(header: Sequence[str]):
+    # Generate a function specialized for the header, e.g.,
+    # def row_factory(r): return {'a': r[0], 'b': r[1]}
+    # which is faster than dict(zip(header, r)).
+    fields = ', '.join(f'{key!r}: r[{idx}]' for idx, key in enumerate(header))
+    namespace: Dict[str, Any] = {}
+    exec(f'def row_factory(r):\n    return {{{fields}}}\n', namespace)
+    return namespace['row_factory']
+
+
+def _get_arrow_csv_parse_options(
+    dialect: str,
+    ignore_error: bool,
+    silent: bool,
+    fmtparams: Mapping[str, Any],
+):
+    # Only the options supported by pyarrow.
+    if not set(fmtparams) <= {'delimiter', 'quotechar', 'doublequote', 'escapechar'}:
+        return None
+
+    csv_dialect = csv.get_dialect(dialect)
+    if csv_dialect.quoting != csv.QUOTE_MINIMAL or csv_dialect.skipinitialspace:
+        return None
+
+    try:
+        import pyarrow.csv
+    except ImportError:
+        return None
+
+    def invalid_row_handler(row: Any):
+        if not ignore_error:
+            return 'error'
+        if not silent:
+            logging.warning(f'Cannot match "{row.text}" with header.')
+        return 'skip'
+
+    return pyarrow.csv.ParseOptions(
+        delimiter=fmtparams.get('delimiter', csv_dialect.delimiter),
+        quote_char=fmtparams.get('quotechar', csv_dialect.quotechar) or False,
+        double_quote=fmtparams.get('doublequote', csv_dialect.doublequote),
+        escape_char=fmtparams.get('escapechar', csv_dialect.escapechar) or False,
+        newlines_in_values=True,
+        invalid_row_handler=invalid_row_handler,
     )
 
 
+# Blank lines, which csv.reader yields as [] while pyarrow skips or fills them.
+_CSV_BLANK_LINE_MARKERS = (b'\n\n', b'\n\r', b'\r\r')
+# With newline=None, the text mode also translates the \r\n in the quoted values.
+_CSV_BLANK_LINE_OR_CR_MARKERS = (b'\n\n', b'\r')
+
+
+def _read_csv_header_for_vectorized(
+    path: Path,
+    encoding: Optional[str],
+    newline: Optional[str],
+    dialect: str,
+    fmtparams: Mapping[str, Any],
+):
+    # Return None if pyarrow could parse differently from csv.reader.
+    if newline not in (None, ''):
+        return None
+    if '\r\n'.encode(encoding or locale.getpreferredencoding(False)) != b'\r\n':
+        # Cannot search the line ends in bytes.
+        return None
+
+    markers = _CSV_BLANK_LINE_OR_CR_MARKERS if newline is None else _CSV_BLANK_LINE_MARKERS
+    with path.open(mode='rb') as fin:
+        if os.fstat(fin.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Also a leading blank line.
+            if mm[:1] in (b'\r', b'\n') or any(mm.find(marker) >= 0 for marker in markers):
+                return None
+
+    with path.open(mode='r', encoding=encoding, newline=newline) as fin:
+        header: Optional[List[str]] = next(csv.reader(fin, dialect, **fmtparams), None)
+        return header
+
+
+def _read_csv_lines_vectorized(
+    path: Path,
+    encoding: Optional[str],
+    parse_options: Any,
+    header: List[str],
+    skip_header: bool,
+    to_dict: bool,
+    infer_types: bool,
+    tqdm: bool,
+):
+    import pyarrow
+    import pyarrow.csv
+
+    column_types = None
+    if not infer_types:
+        # Keep the values as strings, as csv.reader does.
+        column_types = {key: pyarrow.string() for key in header}
+
+    table = pyarrow.csv.read_csv(
+        path,
+        read_options=pyarrow.csv.ReadOptions(
+            use_threads=True,
+            block_size=16 << 20,
+            # Use the header parsed by csv.reader.
+            skip_rows=1,
+            column_names=header,
+            encoding=encoding or locale.getpreferredencoding(False),
+        ),
+        parse_options=parse_options,
+        convert_options=pyarrow.csv.ConvertOptions(column_types=column_types),
+    )
+
+    structs = chain.from_iterable(
+        zip(*(column.to_pylist() for column in batch.columns)) for batch in table.to_batches()
+    )
+    if tqdm:
+        structs = _tqdm(structs, total=table.num_rows)
+    if not skip_header:
+        structs = chain((header,), structs)
+
+    if to_dict:
+        row_factory = _build_csv_row_factory(header)
+        for struct in structs:
+            yield row_factory(struct)
+    else:
+        for struct in structs:
+            yield list(struct)
+
+
 def read_csv_lines(
     raw_path: PathType,
     expandvars: bool = False,
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
     newline: Optional[str] = None,
@@ -241,6 +1154,9 @@ def read_csv_lines(
     ignore_error: bool = False,
     silent: bool = False,
     tqdm: bool = False,
+    vectorized: bool = False,
+    infer_types: bool = False,
+    cache_hint: CacheHint = 'sequential',
     dialect: str = 'excel',
     **fmtparams: Mapping[str, Any],
 ):
@@ -262,17 +1178,51 @@ def read_csv_lines(
             logging.warning(msg)
         return
 
+    if vectorized and match_header and errors is None:
+        # Parse with pyarrow, the values are kept as strings unless infer_types=True.
+        # Fallback to csv.reader if pyarrow is not installed, the dialect is not supported,
+        # or the file contains blank lines (see _read_csv_header_for_vectorized).
+        parse_options = _get_arrow_csv_parse_options(
+            dialect,
+            ignore_error=ignore_error,
+            silent=silent,
+            fmtparams=fmtparams,
+        )
+        header = None
+        if parse_options is not None:
+            header = _read_csv_header_for_vectorized(
+                path,
+                encoding=encoding,
+                newline=newline,
+                dialect=dialect,
+                fmtparams=fmtparams,
+            )
+        if header is not None:
+            yield from _read_csv_lines_vectorized(
+                path,
+                encoding=encoding,
+                parse_options=parse_options,
+                header=header,
+                skip_header=skip_header,
+                to_dict=to_dict,
+                infer_types=infer_types,
+                tqdm=tqdm,
+            )
+            return
+
     with path.open(
         mode='r',
         buffering=buffering,
         encoding=encoding,
         errors=errors,
         newline=newline,
-    ) as fin:
+    ) as fin, _cache_hint(fin.fileno(), cache_hint):
+        _set_text_chunk_size(fin)
         if tqdm:
             fin = _tqdm(fin)
 
         header = None
+        row_factory = None
         for num, struct in enumerate(csv.reader(fin, dialect, **fmtparams)):
             if header_exists and num == 0:
                 if not isinstance(struct, abc.Iterable):  # type: ignore
@@ -284,6 +1234,8 @@ def read_csv_lines(
                     return
 
                 header = list(struct)
+                if to_dict:
+                    row_factory = _build_csv_row_factory(header)
                 if skip_header:
                     continue
 
@@ -300,16 +1252,91 @@ def read_csv_lines(
                     continue
 
                 if to_dict:
-                    struct = dict(zip(header, struct))
+                    # Make linter happy.
+                    assert row_factory is not None
+                    struct = row_factory(struct)
 
             yield struct
 
 
+def _iter_csv_rows_from_dicts(
+    structs: Iterable[Any],
+    from_dict_keys: Sequence[str],
+    set_missing_key_to_none: bool,
+    ignore_unknown_key: bool,
+    ignore_error: bool,
+    silent: bool,
+):
+    from_dict_keys_set = frozenset(from_dict_keys)
+    missing = object()
+
+    for num, struct in enumerate(structs):
+        # Check the exact type first, avoiding the ABC instance check in the common case.
+        if type(struct) is not dict and not isinstance(struct, abc.Mapping):  # type: ignore
+            msg = f'#{num} {struct} should be a mapping.'
+            if not ignore_error:
+                raise TypeError(msg)
+            elif not silent:
+                logging.warning(msg)
+            # Skip this line.
+            continue
+
+        items = []
+        skip_this_struct = False
+        for key in from_dict_keys:
+            # Single lookup.
+            value = struct.get(key, missing)
+            if value is missing:
+                if not set_missing_key_to_none:
+                    msg = f'#{num} key "{key}" not found.'
+                    if not ignore_error:
+                        raise KeyError(msg)
+                    if not silent:
+                        logging.warning(msg + ' Skip.')
+                    # Abort.
+                    skip_this_struct = True
+                    break
+                value = None
+
+            items.append(value)
+
+        if skip_this_struct:
+            continue
+        if not ignore_unknown_key:
+            unknown_keys = struct.keys() - from_dict_keys_set
+            if unknown_keys:
+                msg = f'#{num} contains unknown_keys {unknown_keys}'
+                if not ignore_error:
+                    raise KeyError(msg)
+                if not silent:
+                    logging.warning(msg + ' Skip.')
+                continue
+
+        yield items
+
+
+def _iter_csv_rows(structs: Iterable[Any], ignore_error: bool, silent: bool):
+    for num, struct in enumerate(structs):
+        # Check the exact type first, avoiding the ABC instance check in the common case.
+        if (
+            type(struct) not in (list, tuple)
+            and not isinstance(struct, abc.Iterable)  # type: ignore
+        ):
+            msg = f'#{num} {struct} not iterable.'
+            if not ignore_error:
+                raise ValueError(msg)
+            if not silent:
+                logging.warning(msg + ' Skip.')
+            continue
+
+        yield struct
+
+
 def write_csv_lines(
     raw_path: PathType,
     structs: Iterable[Mapping],
     expandvars: bool = False,
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
     newline: Optional[str] = None,
@@ -331,9 +1358,6 @@ def write_csv_lines(
         errors=errors,
         newline=newline,
     ) as fout:
-        if tqdm:
-            fout = _tqdm(fout)
-
         try:
             iter_structs = iter(structs)
         except TypeError:
@@ -371,105 +1395,188 @@ def write_csv_lines(
             # "Put back" the first struct.
             iter_structs = chain((first_struct,), iter_structs)
 
-        for num, struct in enumerate(iter_structs):
-            if from_dict:
-                if not isinstance(struct, abc.Mapping):  # type: ignore
-                    msg = f'#{num} {struct} should be a mapping.'
-                    if not ignore_error:
-                        raise TypeError(msg)
-                    elif not silent:
-                        logging.warning(msg)
-                    # Skip this line.
-                    continue
+        if from_dict:
+            # Make linter happy.
+            assert isinstance(from_dict_keys, list)
+            rows = _iter_csv_rows_from_dicts(
+                iter_structs,
+                from_dict_keys=from_dict_keys,
+                set_missing_key_to_none=set_missing_key_to_none,
+                ignore_unknown_key=ignore_unknown_key,
+                ignore_error=ignore_error,
+                silent=silent,
+            )
+        else:
+            rows = _iter_csv_rows(iter_structs, ignore_error=ignore_error, silent=silent)
 
-                # Make linter happy.
-                assert isinstance(from_dict_keys, list)
-                items = []
-                skip_this_struct = False
-                for key in from_dict_keys:
-                    if key not in struct and not set_missing_key_to_none:
-                        msg = f'#{num} key "{key}" not found.'
-                        if not ignore_error:
-                            raise KeyError(msg)
-                        if not silent:
-                            logging.warning(msg + ' Skip.')
-                        # Abort.
-                        skip_this_struct = True
-                        break
-
-                    items.append(struct.get(key))
-
-                if skip_this_struct:
-                    continue
-                if not ignore_unknown_key:
-                    unknown_keys = set(struct) - set(from_dict_keys)
-                    if unknown_keys:
-                        msg = f'#{num} contains unknown_keys {unknown_keys}'
-                        if not ignore_error:
-                            raise KeyError(msg)
-                        if not silent:
-                            logging.warning(msg + ' Skip.')
-                        continue
+        if tqdm:
+            rows = _tqdm(rows)
 
-                csv_writer.writerow(items)
+        csv_writer.writerows(rows)
 
-            else:
-                if not isinstance(struct, abc.Iterable):  # type: ignore
-                    msg = f'#{num} {struct} not iterable.'
-                    if not ignore_error:
-                        raise ValueError(msg)
-                    if not silent:
-                        logging.warning(msg + ' Skip.')
-                    continue
 
-                csv_writer.writerow(struct)
+class _Utf8Reader:
+    # ijson consumes UTF-8 bytes (str streams are deprecated), re-encode the text mode.
+
+    def __init__(self, fin: Any):
+        self.fin = fin
+
+    def read(self, size: int = -1):
+        return self.fin.read(size).encode('utf-8')
+
+
+def _read_json_stream(
+    path: Path,
+    buffering: int,
+    encoding: Optional[str],
+    errors: Optional[str],
+    newline: Optional[str],
+    stream_prefix: str,
+    ignore_error: bool,
+    silent: bool,
+    cache_hint: CacheHint,
+):
+    # Make linter happy.
+    assert ijson is not None
+
+    if _is_utf8_encoding(encoding) and errors is None:
+        # Pass the bytes to ijson directly, newline makes no difference to JSON.
+        fin = path.open(mode='rb', buffering=buffering)
+        reader = fin
+    else:
+        fin = path.open(
+            mode='r',
+            buffering=buffering,
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+        )
+        reader = _Utf8Reader(fin)
+
+    with fin, _cache_hint(fin.fileno(), cache_hint):
+        try:
+            yield from ijson.items(reader, stream_prefix)
+        except ijson.JSONError:
+            if not ignore_error:
+                raise
+            if not silent:
+                logging.warning(f'Cannot load {path}')
+
+
+# Minimum file size to parse the memory-mapped file in read_json.
+_JSON_MMAP_MIN_SIZE = 1 << 20
+
+
+def _read_json_mmap(path: Path, cache_hint: CacheHint):
+    # Make linter happy.
+    assert orjson is not None
+
+    # orjson parses the mapped pages directly, skipping the read and decode copies.
+    with path.open(mode='rb') as fin, _cache_hint(fin.fileno(), cache_hint):
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            if not _has_lossy_integer(mm, _JSON_LONG_DIGITS_BYTES_PATTERN, b'-'):
+                with memoryview(mm) as view:
+                    try:
+                        return orjson.loads(view)
+                    except orjson.JSONDecodeError:
+                        pass
+
+            # Fallback to json, see _orjson_loads.
+            # Also raises UnicodeDecodeError for invalid UTF-8 as the text mode does,
+            # which orjson reports as JSONDecodeError.
+            return json.loads(str(mm, 'utf-8'))
 
 
 def read_json(
     raw_path: PathType,
     expandvars: bool = False,
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
     newline: Optional[str] = None,
     ignore_error: bool = False,
     silent: bool = False,
+    stream: bool = False,
+    stream_prefix: str = 'item',
+    cache_hint: CacheHint = 'sequential',
 ):
     path = file(raw_path, expandvars=expandvars, exists=True)
 
-    with path.open(
-        mode='r',
-        buffering=buffering,
-        encoding=encoding,
-        errors=errors,
-        newline=newline,
-    ) as fin:
-        try:
-            struct: Union[Mapping, Sequence] = json.load(fin)
-            return struct
-        except json.JSONDecodeError:
-            if not ignore_error:
-                raise
-            if not silent:
-                logging.warning(f'Cannot load {path}')
-            return {}
+    if stream:
+        # Yield the objects under stream_prefix (ijson syntax) instead of loading the whole
+        # document. The default 'item' matches the elements of a top-level array.
+        if ijson is None:
+            raise ImportError('ijson is required for stream=True.')
+        iterable: Iterable[Any] = _read_json_stream(
+            path,
+            buffering=buffering,
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+            stream_prefix=stream_prefix,
+            ignore_error=ignore_error,
+            silent=silent,
+            cache_hint=cache_hint,
+        )
+        return iterable
+
+    use_mmap = (
+        orjson is not None and errors is None
+        and _is_utf8_encoding(encoding)
+        and path.stat().st_size > _JSON_MMAP_MIN_SIZE
+    )
+
+    try:
+        if use_mmap:
+            struct: Union[Mapping, Sequence] = _read_json_mmap(path, cache_hint=cache_hint)
+        else:
+            with path.open(
+                mode='r',
+                buffering=buffering,
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+            ) as fin, _cache_hint(fin.fileno(), cache_hint):
+                struct = _json_loads(fin.read())
+        return struct
+
+    except json.JSONDecodeError:
+        if not ignore_error:
+            raise
+        if not silent:
+            logging.warning(f'Cannot load {path}')
+        return {}
 
 
 def write_json(
     raw_path: PathType,
     struct: Union[Mapping, Sequence],
     expandvars: bool = False,
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
     newline: Optional[str] = None,
-    ensure_ascii: bool = True,
+    ensure_ascii: bool = False,
     indent: Optional[int] = None,
     ignore_error: bool = False,
     silent: bool = False,
 ):
     path = file(raw_path, expandvars=expandvars)
 
+    if _is_utf8_output(encoding, errors, newline):
+        # Write the encoded bytes directly, skipping the re-encoding of the text mode.
+        with path.open(mode='wb', buffering=buffering) as fout:
+            try:
+                fout.write(_json_dumps_utf8(struct, ensure_ascii=ensure_ascii, indent=indent))
+            except (TypeError, OverflowError, ValueError):
+                if not ignore_error:
+                    raise
+                if not silent:
+                    logging.warning(f'Cannot encode "{struct}"')
+        return
+
     with path.open(
         mode='w',
         buffering=buffering,
@@ -478,7 +1585,7 @@ def write_json(
         newline=newline,
     ) as fout:
         try:
-            json.dump(struct, fout, ensure_ascii=ensure_ascii, indent=indent)
+            fout.write(_json_dumps(struct, ensure_ascii=ensure_ascii, indent=indent))
         except (TypeError, OverflowError, ValueError):
             if not ignore_error:
                 raise
@@ -491,20 +1598,47 @@ def read_toml(
     expandvars: bool = False,
 ):
     path = file(raw_path, expandvars=expandvars, exists=True)
-    return toml.load(path)
+
+    try:
+        # Python >= 3.11.
+        import tomllib
+    except ImportError:
+        import toml
+        return toml.load(path)
+
+    with path.open(mode='rb') as fin:
+        return tomllib.load(fin)
 
 
 def write_toml(
     raw_path: PathType,
     struct: Mapping,
     expandvars: bool = False,
-    buffering: int = -1,
+    buffering: int = DEFAULT_BUFFERING,
     encoding: Optional[str] = None,
     errors: Optional[str] = None,
     newline: Optional[str] = None,
 ):
     path = file(raw_path, expandvars=expandvars)
 
+    try:
+        import tomli_w
+    except ImportError:
+        tomli_w = None
+
+    if tomli_w is not None and _is_utf8_output(encoding, errors, newline):
+        try:
+            # tomli_w always writes UTF-8. Encode before opening, not to leave a partial file.
+            data = tomli_w.dumps(struct).encode('utf-8')
+        except TypeError:
+            # Fallback to toml for the values not supported by tomli_w, e.g., None (skipped).
+            data = None
+
+        if data is not None:
+            with path.open(mode='wb', buffering=buffering) as fout:
+                fout.write(data)
+            return
+
     with path.open(
         mode='w',
         buffering=buffering,
@@ -512,32 +1646,103 @@ def write_toml(
         errors=errors,
         newline=newline,
     ) as fout:
+        import toml
         toml.dump(struct, fout)
 
 
+class _JoblibManifest:
+    # Written by write_joblib(parallel > 1), pointing to the part files.
+
+    def __init__(self, part_names: Sequence[str]):
+        self.part_names = list(part_names)
+
+
 def read_joblib(
     raw_path: PathType,
     expandvars: bool = False,
     mmap_mode: Optional[str] = None,
 ):
+    import joblib
+
     path = file(raw_path, expandvars=expandvars, exists=True)
-    return joblib.load(path, mmap_mode=mmap_mode)
+    struct = joblib.load(path, mmap_mode=mmap_mode)
+
+    if isinstance(struct, _JoblibManifest):
+        part_paths = [path.parent / part_name for part_name in struct.part_names]
+        with ThreadPoolExecutor(max_workers=len(part_paths)) as executor:
+            parts = executor.map(
+                lambda part_path: joblib.load(part_path, mmap_mode=mmap_mode),
+                part_paths,
+            )
+            struct = {}
+            for part in parts:
+                struct.update(part)
+
+    return struct
+
+
+# Let joblib pick the compressor if the suffix implies one.
+_JOBLIB_COMPRESSOR_SUFFIXES = ('.z', '.gz', '.bz2', '.xz', '.lzma', '.lz4')
+
+
+def _get_joblib_compress(path: Path, compress: Union[bool, int, str, Tuple[str, int]]):
+    if (
+        isinstance(compress, int) and compress
+        and path.suffix not in _JOBLIB_COMPRESSOR_SUFFIXES
+        and importlib.util.find_spec('lz4') is not None
+    ):
+        # Use lz4 instead of the zlib default, much faster at similar ratios for numeric data.
+        # joblib treats compress=True as level 3.
+        return ('lz4', 3 if compress is True else compress)
+    return compress
 
 
 def write_joblib(
     raw_path: PathType,
     struct: Any,
     expandvars: bool = False,
-    compress: int = 0,
-    protocol: Optional[int] = None,
+    compress: Union[bool, int, str, Tuple[str, int]] = 0,
+    protocol: Optional[int] = pickle.HIGHEST_PROTOCOL,
     cache_size: Optional[int] = None,
+    parallel: int = 1,
 ):
+    import joblib
+
     path = file(raw_path, expandvars=expandvars)
 
-    joblib.dump(
-        struct,
-        path,
-        compress=compress,
-        protocol=protocol,
-        cache_size=cache_size,
-    )
+    kwargs: Dict[str, Any] = {
+        'compress': _get_joblib_compress(path, compress),
+        'protocol': protocol,
+    }
+    if cache_size is not None:
+        # Removed in joblib 1.3.
+        kwargs['cache_size'] = cache_size
+
+    # Remove the part files of the previous write(parallel > 1), if any.
+    part_prefix = f'{path.name}.part'
+    for part_path in path.parent.glob(f'{glob.escape(part_prefix)}*'):
+        if part_path.name[len(part_prefix):].isdigit():
+            part_path.unlink()
+
+    if parallel > 1 and isinstance(struct, abc.Mapping) and len(struct) > 1:
+        # Shard the items to part files, dumped by threads (compression and I/O release the GIL).
+        # Contiguous shards to keep the key order.
+        items = list(struct.items())
+        part_size = -(-len(items) // parallel)
+        num_parts = -(-len(items) // part_size)
+        part_names = [f'{path.name}.part{idx}' for idx in range(num_parts)]
+        with ThreadPoolExecutor(max_workers=num_parts) as executor:
+            futures = [
+                executor.submit(
+                    joblib.dump,
+                    dict(items[idx * part_size:(idx + 1) * part_size]),
+                    path.parent / part_name,
+                    **kwargs,
+                ) for idx, part_name in enumerate(part_names)
+            ]
+            for future in futures:
+                future.result()
+
+        struct = _JoblibManifest(part_names)
+
+    joblib.dump(struct, path, **kwargs)